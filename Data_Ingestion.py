@@ -0,0 +1,346 @@
+"""
+Concurrent Ingestion of Per-Year Index Exports & LULC Rasters
+==============================================================
+Discovers and loads the annual inputs concurrently instead of reading them one
+after another in notebook loops:
+- Earth Engine table exports (geodata/exports/*<year>*.csv)
+- LULC rasters (gis/LULC2017c.tif ... gis/LULC2024c.tif)
+
+File reads run on asyncio, decoding (CSV parsing, GeoTIFF decode) on a thread
+pool. At most PREFETCH files are being read, decoded or waiting for the
+consumer at any time, files whose SHA-256 matches the ingest manifest are skipped, and
+progress metrics are printed as files arrive.
+
+ingest() is a generator: the area-statistics and index-table stages in consume()
+iterate over it and compute on each file while the next ones are still being
+read. The regression scripts fit on all years at once, so they read the merged
+index table rather than the stream, and only when run with --ingested-indices.
+"""
+
+import asyncio
+import glob
+import hashlib
+import io
+import json
+import os
+import queue
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+import numpy as np
+from Data_Validation import read_table
+
+TABLE_PATTERN = 'geodata/exports/*.csv'
+LULC_PATTERN = 'gis/LULC*c.tif'
+MANIFEST_FILE = 'geodata/.ingest_manifest.json'
+
+# Outputs; unchanged (skipped) years keep their rows from the previous run
+AREA_FILE = 'geodata/LULCAreaCover.csv'
+INGESTED_INDICES_FILE = 'geodata/indices_ingested.csv'
+COMBINED_INDICES_FILE = 'geodata/indices_1985_2025.csv'
+
+# Opt-in flag for the modelling scripts, and what an ingested index table must
+# contain before they will use it (the years with data in the combined export)
+USE_INGESTED_FLAG = '--ingested-indices'
+MODEL_INDEX_COLUMNS = ['year', 'mean_ndvi', 'mean_ndwi', 'mean_bui', 'mean_lst']
+MODEL_YEARS = range(1988, 2026)
+
+PREFETCH = 4           # files read/decoded ahead of the consumer
+DECODE_WORKERS = 4
+
+# LULC class codes (as in Analysis.ipynb / Hy1.ipynb)
+WATER_CLASS = 1
+VEGETATION_CLASS = 2
+FLOODED_CLASS = 9
+FLOOD_CLASS = 4
+URBAN_CLASS = 7
+
+YEAR_RE = re.compile(r'(?<!\d)(19[89]\d|20\d{2})(?!\d)')
+
+_DONE = object()
+
+
+# ============================================================================
+# DISCOVERY
+# ============================================================================
+def discover(table_pattern=TABLE_PATTERN, lulc_pattern=LULC_PATTERN):
+    """List per-year input files as (path, kind, year), sorted by year"""
+    found = []
+    for pattern, kind in [(table_pattern, 'table'), (lulc_pattern, 'lulc')]:
+        for path in glob.glob(pattern):
+            match = YEAR_RE.search(os.path.basename(path))
+            found.append((path, kind, int(match.group(1)) if match else None))
+    return sorted(found, key=lambda f: (f[1], f[2] or 0, f[0]))
+
+
+def load_manifest(path=MANIFEST_FILE):
+    if os.path.exists(path):
+        with open(path) as f:
+            return json.load(f)
+    return {}
+
+
+def save_manifest(manifest, path=MANIFEST_FILE):
+    with open(path, 'w') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+
+
+def commit_manifest(processed, path=MANIFEST_FILE):
+    """Record checksums of processed files; call only once their outputs are written"""
+    manifest = load_manifest(path)
+    manifest.update(processed)
+    save_manifest(manifest, path)
+
+
+# ============================================================================
+# DECODE
+# ============================================================================
+def _read_bytes(path):
+    with open(path, 'rb') as f:
+        return f.read()
+
+
+def decode(kind, raw):
+    """Decode raw file bytes: table exports to a DataFrame, LULC rasters to band 1 + georeferencing"""
+    if kind == 'table':
+        frame = read_table(io.BytesIO(raw))
+        return frame.drop(columns=[c for c in ['system:index', '.geo'] if c in frame.columns])
+
+    import rasterio
+    with rasterio.MemoryFile(raw) as memfile, memfile.open() as src:
+        return {'data': src.read(1), 'transform': src.transform, 'crs': src.crs, 'nodata': src.nodata}
+
+
+# ============================================================================
+# PRODUCER
+# ============================================================================
+async def _produce(files, out, bridge, manifest, metrics, stop, only_changed, prefetch, decode_workers):
+    loop = asyncio.get_running_loop()
+    # One slot per file from the start of its read until the consumer takes it,
+    # so at most PREFETCH files are being read, decoded or waiting at any time.
+    # The consumer thread gives slots back through bridge['release'].
+    slots = asyncio.Semaphore(prefetch)
+    bridge['release'] = lambda: loop.call_soon_threadsafe(slots.release)
+
+    with ThreadPoolExecutor(max_workers=decode_workers) as decode_pool:
+        async def load(path, kind, year):
+            await slots.acquire()
+            if stop.is_set():
+                slots.release()  # pass the slot on so the remaining loads can exit too
+                return
+            raw = await asyncio.to_thread(_read_bytes, path)
+            checksum = hashlib.sha256(raw).hexdigest()
+            metrics['bytes_read'] += len(raw)
+            if only_changed and manifest.get(path) == checksum:
+                metrics['skipped'] += 1
+                slots.release()
+                return
+            data = await loop.run_in_executor(decode_pool, decode, kind, raw)
+            metrics['decoded'] += 1
+            # Never blocks: the slot, not the queue, bounds how many items are waiting
+            out.put({'path': path, 'kind': kind, 'year': year, 'checksum': checksum, 'data': data})
+
+        await asyncio.gather(*(load(*f) for f in files))
+
+
+def _run_producer(files, out, bridge, manifest, metrics, stop, only_changed, prefetch, decode_workers):
+    try:
+        asyncio.run(_produce(files, out, bridge, manifest, metrics, stop,
+                             only_changed, prefetch, decode_workers))
+    except BaseException as exc:  # surfaced to the consumer
+        out.put(exc)
+    else:
+        out.put(_DONE)
+
+
+def _release(bridge):
+    """Return a prefetch slot to the producer (no-op once its event loop has finished)"""
+    release = bridge.get('release')
+    if release is not None:
+        try:
+            release()
+        except RuntimeError:
+            pass
+
+
+# ============================================================================
+# GENERATOR INTERFACE
+# ============================================================================
+def ingest(files=None, only_changed=True, prefetch=PREFETCH, decode_workers=DECODE_WORKERS,
+           manifest_file=MANIFEST_FILE, metrics=None, processed=None, verbose=True):
+    """Yield decoded per-year inputs as dicts (path, kind, year, checksum, data) as they arrive
+
+    The manifest is only read here. Checksums of files the consumer has processed
+    are collected in processed (path -> checksum); pass them to commit_manifest()
+    after the outputs are written, so an interrupted run re-ingests whatever was
+    not finished.
+    """
+    files = discover() if files is None else files
+    manifest = load_manifest(manifest_file)
+    metrics = {} if metrics is None else metrics
+    processed = {} if processed is None else processed
+    metrics.update({'discovered': len(files), 'decoded': 0, 'skipped': 0, 'bytes_read': 0,
+                    'processed': 0, 'elapsed_s': 0.0})
+
+    out = queue.Queue()
+    bridge = {}
+    stop = threading.Event()
+    producer = threading.Thread(target=_run_producer, daemon=True,
+                                args=(files, out, bridge, manifest, metrics, stop,
+                                      only_changed, prefetch, decode_workers))
+    start = time.perf_counter()
+    producer.start()
+    try:
+        while True:
+            item = out.get()
+            if item is _DONE:
+                break
+            if isinstance(item, BaseException):
+                raise item
+            _release(bridge)
+            yield item
+            processed[item['path']] = item['checksum']
+            metrics['processed'] += 1
+            metrics['elapsed_s'] = time.perf_counter() - start
+            if verbose:
+                mb = metrics['bytes_read'] / 1e6
+                print(f"   {item['path']} | processed {metrics['processed']}, "
+                      f"skipped {metrics['skipped']} of {metrics['discovered']}, read {mb:.1f} MB, "
+                      f"{mb / max(metrics['elapsed_s'], 1e-9):.1f} MB/s")
+    finally:
+        stop.set()
+        _release(bridge)  # wake any load still waiting for a slot
+        producer.join()
+        metrics['elapsed_s'] = time.perf_counter() - start
+
+
+# ============================================================================
+# CONSUMER STAGES
+# ============================================================================
+def lulc_area_row(item):
+    """Class areas (m²) for one LULC raster, in the LULCAreaCover.csv layout"""
+    lulc_data = item['data']['data']
+    pixel_area = abs(item['data']['transform'][0] * item['data']['transform'][4])
+    counts = np.bincount(lulc_data.ravel().astype(np.int64).clip(min=0),
+                         minlength=max(WATER_CLASS, VEGETATION_CLASS, FLOODED_CLASS,
+                                       FLOOD_CLASS, URBAN_CLASS) + 1)
+    return {
+        'Year': item['year'],
+        'Water Area (m²)': counts[WATER_CLASS] * pixel_area,
+        'Flood Area (m²)': counts[FLOOD_CLASS] * pixel_area,
+        'Flooded Area (m²)': counts[FLOODED_CLASS] * pixel_area,
+        'Vegetation Area (m²)': counts[VEGETATION_CLASS] * pixel_area,
+        'Urban Area (m²)': counts[URBAN_CLASS] * pixel_area,
+    }
+
+
+def merge_by_year(new, path, year_col, index=False):
+    """Replace the years in new within the table saved at path, keeping all other years"""
+    if os.path.exists(path):
+        previous = pd.read_csv(path, index_col=0 if index else None)
+        new = pd.concat([previous[~previous[year_col].isin(new[year_col])], new])
+    new = new.sort_values(year_col).reset_index(drop=True)
+    new.to_csv(path, index=index)
+    return new
+
+
+def indices_source(use_ingested=False):
+    """Index table for the modelling stage: the combined Earth Engine export by default,
+    or the ingested per-year table when explicitly requested and complete"""
+    if not use_ingested:
+        return COMBINED_INDICES_FILE
+    if not os.path.exists(INGESTED_INDICES_FILE):
+        raise FileNotFoundError(f"{INGESTED_INDICES_FILE} not found; run Data_Ingestion.py first")
+    table = read_table(INGESTED_INDICES_FILE)
+    missing = [col for col in MODEL_INDEX_COLUMNS if col not in table.columns]
+    if missing:
+        raise ValueError(f"{INGESTED_INDICES_FILE} lacks columns {missing}")
+    absent = sorted(set(MODEL_YEARS) - set(table['year'].dropna().astype(int)))
+    if absent:
+        raise ValueError(f"{INGESTED_INDICES_FILE} lacks years {absent}")
+    return INGESTED_INDICES_FILE
+
+
+def consume(items):
+    """Split the ingest stream into LULC area statistics and index tables for modelling
+
+    Files that cannot be placed in a year (LULC rasters without a year in the name,
+    table exports with neither a year column nor a year in the name) are returned
+    in rejected instead of being merged.
+    """
+    area_rows, tables, rejected = [], [], []
+    for item in items:
+        if item['kind'] == 'lulc':
+            if item['year'] is None:
+                rejected.append(item['path'])
+                continue
+            area_rows.append(lulc_area_row(item))
+        else:
+            table = item['data']
+            if 'year' not in table.columns:
+                if item['year'] is None:
+                    rejected.append(item['path'])
+                    continue
+                table = table.assign(year=item['year'])
+            tables.append(table)
+    areas = pd.DataFrame(area_rows)
+    if len(areas):
+        areas = areas.sort_values('Year').reset_index(drop=True)
+    indices = pd.concat(tables, ignore_index=True) if tables else pd.DataFrame()
+    if 'year' in indices.columns:
+        indices = indices.sort_values('year').reset_index(drop=True)
+    return areas, indices, rejected
+
+
+if __name__ == "__main__":
+    print("=" * 80)
+    print("CONCURRENT INGESTION")
+    print("Per-Year Earth Engine Index Exports & LULC Rasters")
+    print("=" * 80)
+
+    # ========================================================================
+    # 1. DISCOVER
+    # ========================================================================
+    print("\n[1] DISCOVERING INPUT FILES...")
+    files = discover()
+    n_lulc = sum(1 for f in files if f[1] == 'lulc')
+    print(f"✓ Found {len(files) - n_lulc} index table exports and {n_lulc} LULC rasters")
+
+    # ========================================================================
+    # 2. INGEST & COMPUTE
+    # ========================================================================
+    print("\n[2] INGESTING (ASYNC READ, THREADED DECODE)...")
+    metrics = {}
+    processed = {}
+    areas, new_indices, rejected = consume(ingest(files, metrics=metrics, processed=processed))
+    print(f"✓ Decoded {metrics['decoded']} files, skipped {metrics['skipped']} unchanged, "
+          f"{metrics['bytes_read'] / 1e6:.1f} MB in {metrics['elapsed_s']:.2f} s")
+    for path in rejected:
+        # Left out of the manifest so the file is retried once it is fixed
+        processed.pop(path, None)
+        print(f"✗ Rejected {path}: no 'year' column and no year in the file name")
+
+    # ========================================================================
+    # 3. SAVE OUTPUTS
+    # ========================================================================
+    print("\n[3] SAVING OUTPUTS...")
+    if len(areas):
+        areas = merge_by_year(areas, AREA_FILE, 'Year', index=True)
+        print(f"✓ Updated LULC area statistics: {AREA_FILE}")
+        print(areas.to_string(index=False))
+    if len(new_indices):
+        n_new = len(new_indices)
+        new_indices = merge_by_year(new_indices, INGESTED_INDICES_FILE, 'year')
+        print(f"✓ Merged {n_new} rows of new/changed index exports into: {INGESTED_INDICES_FILE} "
+              f"({len(new_indices)} years; use with {USE_INGESTED_FLAG})")
+    if not len(areas) and not len(new_indices):
+        print("✓ All inputs unchanged since the last run")
+
+    # Only now are the processed files safe to skip next time
+    commit_manifest(processed)
+
+    print("\n✓ Ingestion Complete!")
+    print("=" * 80)
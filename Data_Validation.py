@@ -0,0 +1,179 @@
+"""
+Data Quality & Sentinel Masking
+===============================
+Shared validation stage for the CSV inputs and index rasters.
+
+- read_table(): loads a CSV with BOM-prefixed headers (MainC.csv, GeoData1.csv)
+  and trailing empty columns (MainPp.csv) cleaned up
+- validity_array(): one vectorized pass producing a validity bitmask for an
+  array of values (rows or raster pixels × variables)
+- validity_flags(): the same per-cell bitmask for the numeric columns of a table
+- load_validity(): the same flags, cached next to the data as <file>.validity.npz
+  and recomputed only when the source file changes
+- valid_index(): row labels that pass, so later stages filter by index instead
+  of replace(-9999, np.nan) + dropna() copies of whole frames
+
+Run directly to print a validation report for every CSV in data/ and geodata/.
+"""
+
+import glob
+import hashlib
+import json
+import os
+
+import pandas as pd
+import numpy as np
+
+# Validity bits (0 = valid)
+SENTINEL = 1        # Earth Engine / GIS fill value (-9999)
+MISSING = 2         # empty cell / NaN
+OUT_OF_RANGE = 4    # outside the physical range of the variable
+LST_DN = 8          # land surface temperature still in digital numbers, not Kelvin
+
+FLAG_NAMES = {SENTINEL: 'sentinel', MISSING: 'missing', OUT_OF_RANGE: 'out_of_range', LST_DN: 'lst_dn'}
+
+# Rows carrying these bits have no usable value; range/unit bits are reported only
+REJECT_DEFAULT = SENTINEL | MISSING
+
+SENTINEL_VALUE = -9999
+
+# Physical ranges by column name. BUI (mean_bui, BUI_Built_Up_Index) is left out
+# until its unit is fixed upstream: the exports hold raw values around 3000-4000.
+VALUE_RANGES = {
+    'mean_ndvi': (-1.0, 1.0),
+    'mean_ndwi': (-1.0, 1.0),
+    'ndvi': (-1.0, 1.0),    # NDVI_/NDWI_ period rasters in gis/
+    'ndwi': (-1.0, 1.0),
+    'NDVI_Vegetation_Index': (-1.0, 1.0),
+    'NDWI_Water_Index': (-1.0, 1.0),
+    'pH': (0.0, 14.0), 'pHT': (0.0, 14.0), 'pHS': (0.0, 14.0), 'Soil pH': (0.0, 14.0),
+    'SOC%': (0.0, 100.0), 'SOC%T': (0.0, 100.0), 'SOC%S': (0.0, 100.0),
+    'TN': (0.0, 100.0), 'TNT': (0.0, 100.0), 'TNS': (0.0, 100.0),
+    'Clay': (0.0, 100.0), 'ClayT': (0.0, 100.0), 'ClayS': (0.0, 100.0),
+    'Clay %': (0.0, 100.0), 'Silt %': (0.0, 100.0), 'Sand%': (0.0, 100.0),
+}
+
+# Land surface temperature columns and plausible Kelvin range
+LST_COLUMNS = {'mean_lst', 'LST_Land_Surface_Temp'}
+LST_KELVIN_RANGE = (200.0, 350.0)
+
+
+def read_table(path):
+    """Read a CSV, stripping a UTF-8 BOM from the header and dropping trailing empty columns"""
+    frame = pd.read_csv(path, encoding='utf-8-sig')
+    frame.columns = frame.columns.str.strip()
+    empty = [col for col in frame.columns if col.startswith('Unnamed:') and frame[col].isna().all()]
+    return frame.drop(columns=empty)
+
+
+def validity_array(values, variables, sentinels=(SENTINEL_VALUE,)):
+    """Validity bitmask for a (rows or pixels, variables) array; ranges are looked up by variable name"""
+    values = np.asarray(values, dtype=np.float64)
+    variables = list(variables)
+
+    flags = np.zeros(values.shape, dtype=np.uint8)
+    missing = np.isnan(values)
+    sentinel = np.isin(values, sentinels)
+    flags[missing] |= MISSING
+    flags[sentinel] |= SENTINEL
+    present = ~(missing | sentinel)
+
+    lower = np.array([VALUE_RANGES.get(var, (-np.inf, np.inf))[0] for var in variables])
+    upper = np.array([VALUE_RANGES.get(var, (-np.inf, np.inf))[1] for var in variables])
+    is_lst = np.array([var in LST_COLUMNS for var in variables], dtype=bool)
+    lower[is_lst], upper[is_lst] = LST_KELVIN_RANGE
+
+    with np.errstate(invalid='ignore'):
+        above = present & (values > upper)
+        below = present & (values < lower)
+    flags[above & is_lst] |= LST_DN
+    flags[(above & ~is_lst) | below] |= OUT_OF_RANGE
+    return flags
+
+
+def validity_flags(frame):
+    """Per-cell validity bitmask for the numeric columns of a frame (one vectorized pass)"""
+    numeric = frame.select_dtypes(include='number')
+    flags = validity_array(numeric.to_numpy(dtype=np.float64), numeric.columns)
+    return pd.DataFrame(flags, index=frame.index, columns=numeric.columns)
+
+
+def _cache_path(path):
+    return f"{path}.validity.npz"
+
+
+def _rules_hash():
+    """Fingerprint of the flag rules, so cached flags are recomputed when they change"""
+    rules = {
+        'flags': sorted(FLAG_NAMES.items()),
+        'sentinel': SENTINEL_VALUE,
+        'ranges': sorted((k, list(v)) for k, v in VALUE_RANGES.items()),
+        'lst_columns': sorted(LST_COLUMNS),
+        'lst_range': list(LST_KELVIN_RANGE),
+    }
+    return hashlib.sha256(json.dumps(rules).encode()).hexdigest()
+
+
+def load_validity(path, frame=None):
+    """Validity flags for a data file, cached next to it and refreshed when the file changes"""
+    stat = os.stat(path)
+    cache = _cache_path(path)
+    rules = _rules_hash()
+    if os.path.exists(cache):
+        with np.load(cache, allow_pickle=False) as cached:
+            if ('rules' in cached and str(cached['rules']) == rules
+                    and int(cached['mtime_ns']) == stat.st_mtime_ns and int(cached['size']) == stat.st_size):
+                # Labels go through JSON so integer column/row labels keep their type
+                return pd.DataFrame(cached['flags'], index=pd.Index(json.loads(str(cached['index']))),
+                                    columns=json.loads(str(cached['columns'])))
+
+    if frame is None:
+        frame = read_table(path)
+    flags = validity_flags(frame)
+    np.savez(cache, flags=flags.to_numpy(), index=json.dumps(flags.index.tolist()),
+             columns=json.dumps(flags.columns.tolist()), rules=rules,
+             mtime_ns=stat.st_mtime_ns, size=stat.st_size)
+    return flags
+
+
+def row_flags(flags, columns=None):
+    """Combine per-cell flags into one bitmask per row (optionally over a column subset)"""
+    cells = flags if columns is None else flags[list(columns)]
+    return pd.Series(np.bitwise_or.reduce(cells.to_numpy(), axis=1), index=flags.index)
+
+
+def valid_index(flags, columns=None, reject=REJECT_DEFAULT):
+    """Row labels whose selected columns carry none of the rejected bits"""
+    rows = row_flags(flags, columns)
+    return rows.index[(rows.to_numpy() & reject) == 0]
+
+
+def describe_flags(flags):
+    """Count of cells carrying each bit, per column"""
+    return pd.DataFrame({
+        name: (flags.to_numpy() & bit != 0).sum(axis=0) for bit, name in FLAG_NAMES.items()
+    }, index=flags.columns)
+
+
+if __name__ == "__main__":
+    print("=" * 80)
+    print("DATA QUALITY & SENTINEL MASKING")
+    print("=" * 80)
+
+    files = sorted(glob.glob('data/*.csv') + glob.glob('geodata/*.csv'))
+    for i, path in enumerate(files, start=1):
+        print(f"\n[{i}] {path}")
+        frame = read_table(path)
+        flags = load_validity(path, frame)
+        rows = row_flags(flags)
+        print(f"✓ {len(frame)} rows, {len(flags.columns)} numeric columns, "
+              f"{len(valid_index(flags))} rows without sentinel/missing values")
+        counts = describe_flags(flags)
+        counts = counts[counts.sum(axis=1) > 0]
+        if len(counts):
+            print(counts.to_string())
+        flagged = {name: int(((rows.to_numpy() & bit) != 0).sum()) for bit, name in FLAG_NAMES.items()}
+        print(f"  Rows flagged: {flagged}")
+
+    print("\n✓ Validation Complete! Flags cached as <file>.validity.npz")
+    print("=" * 80)
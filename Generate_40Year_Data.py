@@ -15,6 +15,9 @@ import matplotlib.pyplot as plt
 import seaborn as sns
 from sklearn.linear_model import Ridge
 from sklearn.preprocessing import StandardScaler
+from Data_Validation import read_table, load_validity, valid_index
+from Data_Ingestion import indices_source, USE_INGESTED_FLAG
+import sys
 import warnings
 warnings.filterwarnings('ignore')
 
@@ -27,10 +30,13 @@ print("=" * 90)
 # ============================================================================
 print("\n[1] LOADING DATA...")
 
-# Load satellite indices
-indices = pd.read_csv('geodata/indices_1985_2025.csv')
-indices.drop(columns=['system:index', '.geo'], inplace=True)
-indices.replace(-9999, np.nan, inplace=True)
+# Load satellite indices and their cached validity flags (sentinel, missing, range, LST units)
+# Combined export by default; --ingested-indices switches to the per-year table from Data_Ingestion.py
+indices_file = indices_source(USE_INGESTED_FLAG in sys.argv)
+indices = read_table(indices_file)
+flags = load_validity(indices_file, indices)
+print(f"[OK] Index source: {indices_file}")
+indices.drop(columns=['system:index', '.geo'], inplace=True, errors='ignore')
 print(f"[OK] Loaded satellite indices (1985-2025): {len(indices)} years")
 
 # Load field measurements - 2025 (Present/Current)
@@ -48,8 +54,9 @@ print(f"[OK] Loaded 1985 measurements: {len(topsoil_1985)} locations")
 # ============================================================================
 print("\n[2] CALCULATING SATELLITE-DERIVED SOC...")
 
-# Get clean indices data
-indices_clean = indices[3:].copy().dropna()
+# Get clean indices data (years without sentinel or missing index values, i.e. 1988 onwards)
+clean_idx = valid_index(flags, ['mean_ndvi', 'mean_ndwi', 'mean_bui', 'mean_lst', 'year'])
+indices_clean = indices.loc[clean_idx]
 indices_clean.reset_index(drop=True, inplace=True)
 
 # Field measured SOC means
@@ -0,0 +1,259 @@
+"""
+Out-of-Core Incremental PCA for Multi-Year Index Raster Stacks
+===============================================================
+Same dimensionality reduction as the site-table PCA in the Biomass and
+Geospatial notebooks (StandardScaler + SimpleImputer + PCA), applied to full
+multi-year index stacks (periods × bands per pixel) that do not fit in memory.
+
+Pixels are streamed in row blocks:
+- Pass 1: streaming scaling statistics (StandardScaler.partial_fit, NaN-aware)
+- Pass 2: IncrementalPCA.partial_fit on scaled blocks, mean-imputed
+- Pass 3: parallel projection of blocks back to component rasters
+
+Output:
+- gis/PCA_components.tif (one band per principal component)
+- geodata/raster_pca_summary.csv (explained variance and loadings)
+"""
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+import numpy as np
+import rasterio
+from rasterio.windows import Window
+from sklearn.decomposition import IncrementalPCA
+from sklearn.preprocessing import StandardScaler
+from Data_Validation import validity_array, SENTINEL_VALUE, REJECT_DEFAULT
+import warnings
+warnings.filterwarnings("ignore", category=UserWarning)
+
+# Aligned multi-year index composites (every band of every file is a feature)
+STACK_FILES = [
+    'gis/NDVI_1985-1995.tif',
+    'gis/NDVI_1996-2005.tif',
+    'gis/NDVI_2006-2015.tif',
+    'gis/NDVI_2016-2025.tif',
+    'gis/NDWI_1985-1995.tif',
+    'gis/NDWI_1996-2005.tif',
+    'gis/NDWI_2006-2015.tif',
+    'gis/NDWI_2016-2025.tif',
+    'gis/BUI_1985-1995.tif',
+    'gis/BUI_1996-2005.tif',
+    'gis/BUI_2006-2015.tif',
+    'gis/BUI_2016-2025.tif',
+]
+
+N_COMPONENTS = 3
+BLOCK_ROWS = 256           # rows per streamed pixel block
+MAX_WORKERS = 4            # threads for the projection pass
+OUTPUT_NODATA = -9999.0
+
+OUTPUT_RASTER = 'gis/PCA_components.tif'
+OUTPUT_SUMMARY = 'geodata/raster_pca_summary.csv'
+
+
+# ============================================================================
+# STACK ACCESS
+# ============================================================================
+def raster_variable(path):
+    """Index name of a period raster, e.g. gis/NDVI_1985-1995.tif -> 'ndvi'"""
+    return path.split('/')[-1].split('_')[0].lower()
+
+
+def describe_stack(files):
+    """Check the rasters are aligned and return (profile, feature names)"""
+    feature_names = []
+    profile = None
+    for path in files:
+        with rasterio.open(path) as src:
+            if profile is None:
+                profile = src.profile.copy()
+            elif (src.width, src.height, src.transform) != (profile['width'], profile['height'], profile['transform']):
+                raise ValueError(f"{path} is not aligned with {files[0]}")
+            stem = path.split('/')[-1].rsplit('.', 1)[0]
+            if src.count == 1:
+                feature_names.append(stem)
+            else:
+                feature_names.extend(f"{stem}_b{b}" for b in range(1, src.count + 1))
+    return profile, feature_names
+
+
+def iter_windows(height, width, block_rows=BLOCK_ROWS):
+    """Full-width row strips covering the raster"""
+    for row_off in range(0, height, block_rows):
+        yield Window(0, row_off, width, min(block_rows, height - row_off))
+
+
+def read_block(datasets, window):
+    """Read one window from every raster as a (pixels, features) float array with NaN for missing"""
+    columns, variables = [], []
+    for src in datasets:
+        data = src.read(window=window, masked=True).astype(np.float64)
+        columns.append(data.filled(np.nan).reshape(data.shape[0], -1).T)
+        variables.extend([raster_variable(src.name)] * data.shape[0])
+    block = np.hstack(columns)
+    # Earth Engine exports use -9999 and 0 as fill values (see Analysis.ipynb)
+    flags = validity_array(block, variables, sentinels=(SENTINEL_VALUE, 0))
+    block[(flags & REJECT_DEFAULT) != 0] = np.nan
+    return block
+
+
+def open_stack(files):
+    return [rasterio.open(path) for path in files]
+
+
+def close_stack(datasets):
+    for src in datasets:
+        src.close()
+
+
+def prepare_block(block, scaler):
+    """Scale a block and mean-impute missing values (0 after scaling); also return all-missing rows"""
+    empty = np.isnan(block).all(axis=1)
+    scaled = scaler.transform(block)
+    scaled[np.isnan(scaled)] = 0.0
+    return scaled, empty
+
+
+# ============================================================================
+# PASS 1 & 2: FIT
+# ============================================================================
+def fit_scaler(files, height, width):
+    """Pass 1: streaming mean/variance per feature (NaNs ignored)"""
+    scaler = StandardScaler()
+    datasets = open_stack(files)
+    try:
+        for window in iter_windows(height, width):
+            block = read_block(datasets, window)
+            block = block[~np.isnan(block).all(axis=1)]
+            if len(block):
+                scaler.partial_fit(block)
+    finally:
+        close_stack(datasets)
+    return scaler
+
+
+def fit_incremental_pca(files, height, width, scaler, n_components=N_COMPONENTS):
+    """Pass 2: IncrementalPCA over scaled, imputed pixel blocks"""
+    ipca = IncrementalPCA(n_components=n_components)
+    pending = []
+    pending_rows = 0
+    # Each full batch is held back by one step so a short remainder can join it
+    ready = None
+    datasets = open_stack(files)
+    try:
+        for window in iter_windows(height, width):
+            scaled, empty = prepare_block(read_block(datasets, window), scaler)
+            scaled = scaled[~empty]
+            if not len(scaled):
+                continue
+            pending.append(scaled)
+            pending_rows += len(scaled)
+            # partial_fit needs at least n_components samples per batch
+            if pending_rows >= n_components:
+                if ready is not None:
+                    ipca.partial_fit(ready)
+                ready = np.vstack(pending)
+                pending, pending_rows = [], 0
+    finally:
+        close_stack(datasets)
+    if ready is None:
+        raise ValueError(f"Fewer than {n_components} valid pixels in the raster stack")
+    ipca.partial_fit(np.vstack([ready] + pending))
+    return ipca
+
+
+# ============================================================================
+# PASS 3: PROJECT
+# ============================================================================
+def project_to_rasters(files, profile, scaler, ipca, output_path=OUTPUT_RASTER, max_workers=MAX_WORKERS):
+    """Pass 3: project blocks onto the components in parallel and write component rasters"""
+    height, width = profile['height'], profile['width']
+    out_profile = profile.copy()
+    out_profile.update(count=ipca.n_components_, dtype='float32', nodata=OUTPUT_NODATA)
+    write_lock = threading.Lock()
+    local = threading.local()
+    opened = []
+    opened_lock = threading.Lock()
+
+    def worker_datasets():
+        # rasterio dataset handles are not thread-safe: one set per thread
+        if not hasattr(local, 'datasets'):
+            local.datasets = open_stack(files)
+            with opened_lock:
+                opened.append(local.datasets)
+        return local.datasets
+
+    with rasterio.open(output_path, 'w', **out_profile) as dst:
+        def project(window):
+            scaled, empty = prepare_block(read_block(worker_datasets(), window), scaler)
+            components = ipca.transform(scaled).astype(np.float32)
+            components[empty] = OUTPUT_NODATA
+            bands = components.T.reshape(ipca.n_components_, int(window.height), int(window.width))
+            with write_lock:
+                dst.write(bands, window=window)
+
+        try:
+            with ThreadPoolExecutor(max_workers=max_workers) as pool:
+                list(pool.map(project, iter_windows(height, width)))
+        finally:
+            for datasets in opened:
+                close_stack(datasets)
+
+
+if __name__ == "__main__":
+    print("=" * 80)
+    print("OUT-OF-CORE INCREMENTAL PCA")
+    print("Multi-Year Spectral Index Raster Stacks (NDVI, NDWI, BUI)")
+    print("=" * 80)
+
+    # ========================================================================
+    # 1. DESCRIBE STACK
+    # ========================================================================
+    print("\n[1] CHECKING RASTER STACK...")
+    profile, feature_names = describe_stack(STACK_FILES)
+    height, width = profile['height'], profile['width']
+    n_blocks = -(-height // BLOCK_ROWS)
+    print(f"✓ {len(STACK_FILES)} rasters, {len(feature_names)} features per pixel")
+    print(f"✓ Raster size: {height} × {width} pixels, streamed in {n_blocks} blocks of {BLOCK_ROWS} rows")
+
+    # ========================================================================
+    # 2. STREAMING SCALING STATISTICS
+    # ========================================================================
+    print("\n[2] PASS 1: STREAMING SCALING STATISTICS...")
+    scaler = fit_scaler(STACK_FILES, height, width)
+    print(f"✓ Pixels seen per feature: {int(np.min(scaler.n_samples_seen_))}-{int(np.max(scaler.n_samples_seen_))}")
+
+    # ========================================================================
+    # 3. INCREMENTAL PCA
+    # ========================================================================
+    print("\n[3] PASS 2: INCREMENTAL PCA...")
+    ipca = fit_incremental_pca(STACK_FILES, height, width, scaler)
+    print(f"✓ Explained variance ratio: {np.round(ipca.explained_variance_ratio_, 4)}")
+    print(f"✓ Cumulative: {ipca.explained_variance_ratio_.sum():.4f}")
+
+    loadings = ipca.components_.T * np.sqrt(ipca.explained_variance_)
+    loadings_df = pd.DataFrame(loadings, index=feature_names,
+                               columns=[f'PC{i+1}' for i in range(ipca.n_components_)])
+    print("\nPCA Loadings:\n", loadings_df.round(3))
+
+    # ========================================================================
+    # 4. PROJECT TO COMPONENT RASTERS
+    # ========================================================================
+    print("\n[4] PASS 3: PROJECTING BLOCKS TO COMPONENT RASTERS...")
+    project_to_rasters(STACK_FILES, profile, scaler, ipca)
+    print(f"✓ Saved component rasters to: {OUTPUT_RASTER}")
+
+    # ========================================================================
+    # 5. SAVE SUMMARY
+    # ========================================================================
+    print("\n[5] SAVING SUMMARY...")
+    summary = loadings_df.T
+    summary.insert(0, 'explained_variance_ratio', ipca.explained_variance_ratio_)
+    summary.index.name = 'component'
+    summary.to_csv(OUTPUT_SUMMARY)
+    print(f"✓ Saved explained variance and loadings to: {OUTPUT_SUMMARY}")
+
+    print("\n✓ Incremental PCA Complete!")
+    print("=" * 80)
@@ -15,6 +15,9 @@ import seaborn as sns
 from sklearn.linear_model import LinearRegression, Ridge
 from sklearn.preprocessing import StandardScaler
 from sklearn.metrics import r2_score, mean_squared_error, mean_absolute_error
+from Data_Validation import read_table, load_validity, valid_index
+from Data_Ingestion import indices_source, USE_INGESTED_FLAG
+import sys
 import warnings
 warnings.filterwarnings("ignore")
 
@@ -32,11 +35,13 @@ print("=" * 80)
 # ============================================================================
 print("\n[1] LOADING DATA...")
 
-# Load satellite indices
-indices = pd.read_csv("geodata/indices_1985_2025.csv")
-indices.drop(columns=["system:index", ".geo"], inplace=True)
-indices = indices[3:]  # Start from 1988 (when data becomes available)
-indices.reset_index(drop=True, inplace=True)
+# Load satellite indices and their cached validity flags (sentinel, missing, range, LST units)
+# Combined export by default; --ingested-indices switches to the per-year table from Data_Ingestion.py
+indices_file = indices_source(USE_INGESTED_FLAG in sys.argv)
+indices = read_table(indices_file)
+flags = load_validity(indices_file, indices)
+print(f"✓ Index source: {indices_file}")
+indices.drop(columns=["system:index", ".geo"], inplace=True, errors="ignore")
 
 # Load field-measured SOC data
 topsoil_2025 = pd.read_csv("data/PresentTopSoil.csv")
@@ -46,7 +51,7 @@ topsoil_1985 = pd.read_csv("data/PreviousTopSoil.csv")
 soc_2025_mean = topsoil_2025["SOC%"].mean()
 soc_1985_mean = topsoil_1985["SOC%"].mean()
 
-print(f"✓ Loaded {len(indices)} years of satellite data (1988-2025)")
+print(f"✓ Loaded {len(indices)} years of satellite data ({int(indices['year'].min())}-{int(indices['year'].max())})")
 print(f"✓ Mean SOC 2025: {soc_2025_mean:.3f}%")
 print(f"✓ Mean SOC 1985: {soc_1985_mean:.3f}%")
 
@@ -55,12 +60,13 @@ print(f"✓ Mean SOC 1985: {soc_1985_mean:.3f}%")
 # ============================================================================
 print("\n[2] PREPARING DATA FOR MODELING...")
 
-# Replace sentinel values (-9999) with NaN
-indices.replace(-9999, np.nan, inplace=True)
+# Keep years without sentinel (-9999) or missing values in the spectral indices
+# (1985-1987 carry no data, so this starts the series in 1988)
+clean_idx = valid_index(flags, ['mean_ndvi', 'mean_ndwi', 'mean_bui', 'mean_lst', 'year'])
 
 # Create a dataset with indices and approximate SOC values
 # We'll use the field data to calibrate the model
-indices_clean = indices.dropna()
+indices_clean = indices.loc[clean_idx]
 
 print(f"✓ Clean indices data: {len(indices_clean)} years with complete spectral data")
 print(f"✓ Year range with complete indices: {int(indices_clean['year'].min())}-{int(indices_clean['year'].max())}")
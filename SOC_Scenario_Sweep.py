@@ -0,0 +1,247 @@
+"""
+SOC Scenario Sweep
+==================
+Sensitivity analysis for the satellite-derived SOC pipeline.
+
+Re-runs the load -> fit -> predict -> assemble steps of SOC_Satellite_Model.py
+(standardized indices, in-sample fit on an interpolated SOC target) for a grid
+of configurations:
+- start year (replaces the hard-coded indices[3:] / 1988 cut-off)
+- spectral index subset (NDVI, NDWI, BUI, LST)
+- regularization: alpha=0 is ordinary least squares, alpha>0 is Ridge
+- SOC interpolation assumption between the 1985 and 2025 field means
+
+Scenarios run in a process pool. The loaded inputs are placed once in shared
+memory and attached read-only by each worker instead of being copied.
+
+Output: geodata/soc_scenario_sweep.csv (one row per scenario)
+"""
+
+import itertools
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import pandas as pd
+import numpy as np
+from sklearn.linear_model import LinearRegression, Ridge
+from sklearn.preprocessing import StandardScaler
+from sklearn.metrics import r2_score, mean_squared_error, mean_absolute_error
+from Data_Validation import read_table, load_validity, REJECT_DEFAULT
+from Data_Ingestion import indices_source, USE_INGESTED_FLAG
+import warnings
+warnings.filterwarnings("ignore")
+
+# Column order of the shared indices array
+INDEX_COLUMNS = ['year', 'mean_ndvi', 'mean_ndwi', 'mean_bui', 'mean_lst']
+ALL_FEATURES = ['mean_ndvi', 'mean_ndwi', 'mean_bui', 'mean_lst']
+
+# Scenario grid. Baseline: 1988, all four indices, alpha=0 (OLS), linear.
+# SOC_Satellite_Model.py keeps Ridge only if its training R² beats LinearRegression,
+# which OLS always wins in-sample, so the production script runs OLS.
+# 1985-1987 are all sentinels, so the earliest usable start year is 1988
+START_YEARS = [1988, 1990, 1995, 2000]
+FEATURE_SUBSETS = [
+    ALL_FEATURES,
+    ['mean_ndvi', 'mean_ndwi'],
+    ['mean_ndvi', 'mean_ndwi', 'mean_bui'],
+    ['mean_ndvi', 'mean_ndwi', 'mean_lst'],
+]
+ALPHAS = [0.0, 0.01, 0.1, 1.0, 10.0, 100.0]
+INTERPOLATIONS = ['linear', 'step', 'exponential']
+
+# Year of the single SOC shift in the 'step' interpolation. This is an assumption:
+# no dated land-use change is available to anchor it, so it sits at the midpoint
+# of the 1985 and 2025 field campaigns.
+STEP_YEAR = 2005
+
+OUTPUT_FILE = "geodata/soc_scenario_sweep.csv"
+
+# Worker-side view of the shared inputs (set by _init_worker)
+_shared = {}
+
+
+# ============================================================================
+# SHARED INPUTS
+# ============================================================================
+def load_inputs(use_ingested=False):
+    """Load spectral indices and field SOC means (same sources as SOC_Satellite_Model.py)"""
+    indices_file = indices_source(use_ingested)
+    print(f"✓ Index source: {indices_file}")
+    indices = read_table(indices_file)
+    flags = load_validity(indices_file, indices)
+
+    topsoil_2025 = pd.read_csv("data/PresentTopSoil.csv")
+    topsoil_1985 = pd.read_csv("data/PreviousTopSoil.csv")
+
+    # Sentinel/missing cells become NaN so each scenario drops them for its own index subset
+    values = indices[INDEX_COLUMNS].to_numpy(dtype=np.float64)
+    values[(flags[INDEX_COLUMNS].to_numpy() & REJECT_DEFAULT) != 0] = np.nan
+    soc_means = (topsoil_1985["SOC%"].mean(), topsoil_2025["SOC%"].mean())
+    return values, soc_means
+
+
+def _init_worker(shm_name, shape, soc_means):
+    """Attach the shared indices array once per worker process"""
+    shm = shared_memory.SharedMemory(name=shm_name)
+    values = np.ndarray(shape, dtype=np.float64, buffer=shm.buf)
+    values.flags.writeable = False
+    _shared['shm'] = shm  # keep the mapping alive for the worker's lifetime
+    _shared['values'] = values
+    _shared['soc_means'] = soc_means
+
+
+# ============================================================================
+# PIPELINE
+# ============================================================================
+def interpolate_soc(years, soc_1985_mean, soc_2025_mean, method='linear'):
+    """Synthetic SOC training target for each year under an interpolation assumption"""
+    years = np.asarray(years, dtype=np.float64)
+    if method == 'linear':
+        slope = (soc_2025_mean - soc_1985_mean) / (2025 - 1985)
+        return soc_1985_mean + slope * (np.clip(years, 1985, 2025) - 1985)
+    elif method == 'step':
+        # Single shift from the 1985 to the 2025 level at STEP_YEAR
+        return np.where(years < STEP_YEAR, soc_1985_mean, soc_2025_mean)
+    elif method == 'exponential':
+        # Constant relative rate of change (exponential decay/growth) between the field means
+        t = (np.clip(years, 1985, 2025) - 1985) / (2025 - 1985)
+        return soc_1985_mean * (soc_2025_mean / soc_1985_mean) ** t
+    raise ValueError(f"Unknown interpolation method: {method}")
+
+
+def run_scenario(scenario):
+    """Run load -> fit -> predict -> assemble for one configuration"""
+    values = _shared['values']
+    soc_1985_mean, soc_2025_mean = _shared['soc_means']
+    features = list(scenario['features'])
+
+    # Load: select rows by start year, keep years with complete selected indices
+    cols = [INDEX_COLUMNS.index(f) for f in features]
+    rows = values[:, 0] >= scenario['start_year']
+    X = values[rows][:, cols]
+    years = values[rows, 0]
+    complete = ~np.isnan(X).any(axis=1)
+    X, years = X[complete], years[complete]
+
+    summary = {
+        'start_year': scenario['start_year'],
+        'features': '+'.join(f.replace('mean_', '').upper() for f in features),
+        'alpha': scenario['alpha'],
+        'interpolation': scenario['interpolation'],
+        'n_years': len(years),
+    }
+    if len(years) < 2:
+        return summary
+
+    # Fit
+    y = interpolate_soc(years, soc_1985_mean, soc_2025_mean, scenario['interpolation'])
+    scaler = StandardScaler()
+    X_scaled = scaler.fit_transform(X)
+    model = LinearRegression() if scenario['alpha'] == 0 else Ridge(alpha=scenario['alpha'])
+    model.fit(X_scaled, y)
+
+    # Predict
+    soc_predicted = model.predict(X_scaled)
+
+    # Assemble
+    summary.update({
+        'first_year': int(years.min()),
+        'last_year': int(years.max()),
+        'r2': r2_score(y, soc_predicted),
+        'rmse': np.sqrt(mean_squared_error(y, soc_predicted)),
+        'mae': mean_absolute_error(y, soc_predicted),
+        'mean_soc_predicted': soc_predicted.mean(),
+        'std_soc_predicted': soc_predicted.std(),
+        'min_soc_predicted': soc_predicted.min(),
+        'max_soc_predicted': soc_predicted.max(),
+        'soc_trend': soc_predicted[-1] - soc_predicted[0],
+    })
+    for feature, coef in zip(features, model.coef_):
+        summary[f"coef_{feature.replace('mean_', '')}"] = coef
+    return summary
+
+
+def build_scenarios():
+    """Cartesian product of the configured grid"""
+    return [
+        {'start_year': start_year, 'features': tuple(features),
+         'alpha': alpha, 'interpolation': interpolation}
+        for start_year, features, alpha, interpolation in itertools.product(
+            START_YEARS, FEATURE_SUBSETS, ALPHAS, INTERPOLATIONS)
+    ]
+
+
+def run_sweep(scenarios, max_workers=None, use_ingested=False):
+    """Run all scenarios in a process pool sharing the loaded inputs"""
+    values, soc_means = load_inputs(use_ingested)
+
+    shm = shared_memory.SharedMemory(create=True, size=values.nbytes)
+    try:
+        shared_values = np.ndarray(values.shape, dtype=values.dtype, buffer=shm.buf)
+        shared_values[:] = values
+        del shared_values  # release the buffer export so the segment can be closed
+
+        with ProcessPoolExecutor(max_workers=max_workers,
+                                 initializer=_init_worker,
+                                 initargs=(shm.name, values.shape, soc_means)) as pool:
+            chunksize = max(1, len(scenarios) // (4 * (max_workers or os.cpu_count() or 1)))
+            results = list(pool.map(run_scenario, scenarios, chunksize=chunksize))
+    finally:
+        shm.close()
+        shm.unlink()
+
+    return pd.DataFrame(results)
+
+
+if __name__ == "__main__":
+    print("=" * 80)
+    print("SOC SCENARIO SWEEP")
+    print("Sensitivity of Satellite-Derived SOC to Start Year, Indices, Alpha, Interpolation")
+    print("=" * 80)
+
+    # ========================================================================
+    # 1. BUILD SCENARIO GRID
+    # ========================================================================
+    print("\n[1] BUILDING SCENARIO GRID...")
+    scenarios = build_scenarios()
+    print(f"✓ {len(scenarios)} scenarios "
+          f"({len(START_YEARS)} start years × {len(FEATURE_SUBSETS)} index subsets × "
+          f"{len(ALPHAS)} alphas × {len(INTERPOLATIONS)} interpolations)")
+
+    # ========================================================================
+    # 2. RUN SCENARIOS
+    # ========================================================================
+    print("\n[2] RUNNING SCENARIOS IN PROCESS POOL...")
+    comparison = run_sweep(scenarios, use_ingested=USE_INGESTED_FLAG in sys.argv)
+    print(f"✓ Completed {len(comparison)} scenarios")
+
+    # ========================================================================
+    # 3. COMPARISON TABLE
+    # ========================================================================
+    print("\n[3] COMPARISON TABLE...")
+    baseline = comparison[
+        (comparison['start_year'] == 1988)
+        & (comparison['features'] == 'NDVI+NDWI+BUI+LST')
+        & (comparison['alpha'] == 0.0)
+        & (comparison['interpolation'] == 'linear')
+    ]
+    print("\nBaseline (SOC_Satellite_Model.py configuration: OLS, 1988-, all indices, linear SOC):")
+    print(baseline.round(4).to_string(index=False))
+
+    print("\nSpread of Mean Predicted SOC by Parameter:")
+    for param in ['start_year', 'features', 'alpha', 'interpolation']:
+        spread = comparison.groupby(param)['mean_soc_predicted'].agg(['mean', 'min', 'max'])
+        print(f"\n  {param}:")
+        print(spread.round(4).to_string())
+
+    # ========================================================================
+    # 4. SAVE RESULTS
+    # ========================================================================
+    print("\n[4] SAVING RESULTS...")
+    comparison.to_csv(OUTPUT_FILE, index=False)
+    print(f"✓ Saved scenario comparison to: {OUTPUT_FILE}")
+
+    print("\n✓ SOC Scenario Sweep Complete!")
+    print("=" * 80)